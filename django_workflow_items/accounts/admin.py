@@ -1,3 +1,107 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .forms import CustomUserChangeForm, CustomUserCreationForm
+from .models import CustomUser, Department
 
-# Register your models here.
+
+class ApproximateCountPaginator(Paginator):
+    """
+    近似计数分页器。
+    - 大表在无筛选条件时, 从 MySQL information_schema 读取表行数估算值代替 COUNT(*) 全表扫描,
+      非 MySQL 或表较小时使用精确计数。
+    - 有筛选或搜索条件时, 最多统计 filtered_count_limit 行, 超出部分不再分页, 需进一步缩小筛选范围。
+    """
+    # 估算行数低于该值时精确计数的开销可忽略, 且估算误差相对较大
+    approximate_threshold = 10000
+    # 有筛选条件时计数的上限, 避免宽泛的筛选条件统计全表
+    filtered_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            # 对带 LIMIT 的子查询计数, 数据库扫描到上限即停止
+            return queryset.order_by()[:self.filtered_count_limit].count()
+        estimate = self.estimate_table_rows(queryset)
+        if estimate is not None and estimate >= self.approximate_threshold:
+            return estimate
+        return super().count
+
+    def estimate_table_rows(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'mysql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+
+def make_work_status_action(status, label):
+    """
+    生成批量修改工作状态的管理操作, 以单条 UPDATE 语句完成修改。
+    批量更新不会触发 auto_now, 需同时写入 updated_at 以便客户端增量同步。
+    """
+    def action(modeladmin, request, queryset):
+        updated = queryset.update(work_status=status, updated_at=timezone.now())
+        modeladmin.message_user(request, f'已将 {updated} 名用户的工作状态修改为"{label}"。')
+
+    action.__name__ = f'mark_{status}'
+    action.short_description = f'将所选用户标记为"{label}"'
+    return action
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    """
+    部门管理, 提供名称搜索以支持用户管理中的部门自动补全。
+    """
+    list_display = ['id', 'name', 'description', 'updated_at']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(UserAdmin):
+    """
+    用户管理, 基于 UserAdmin 提供新增用户时设置密码与修改密码页面, 并针对大规模员工表优化:
+    - 列表一次 JOIN 取回部门, 避免逐行查询。
+    - 不执行精确总数统计, 无筛选时使用 MySQL 表统计信息估算行数, 有筛选时计数设有上限。
+    - work_status 已建立索引, 按工作状态筛选无需全表扫描。
+    - 部门使用自动补全控件, 不渲染全部部门的下拉列表。
+    - 默认按主键(雪花ID)倒序, 即按加入时间倒序, 无需文件排序。
+    """
+    list_display = ['id', 'username', 'email', 'department', 'position', 'work_status', 'is_active', 'date_joined']
+    list_display_links = ['id', 'username']
+    list_select_related = ['department']
+    list_filter = ['work_status', 'department', 'is_active', 'is_staff']
+    search_fields = ['^username', '^email'] # 前缀匹配, 可利用唯一索引
+    ordering = ['-id']
+    show_full_result_count = False
+    paginator = ApproximateCountPaginator
+    autocomplete_fields = ['department']
+    form = CustomUserChangeForm
+    add_form = CustomUserCreationForm
+    readonly_fields = ['id', 'last_login', 'date_joined', 'updated_at']
+    fieldsets = [
+        ('账号信息', {'fields': ['id', 'username', 'password', 'email', 'phone_number', 'gender']}),
+        ('工作信息', {'fields': [
+            'department', 'position', 'work_status', 'current_destination',
+            'date_of_joining', 'date_of_leaving', 'emergency_contact', 'avatar',
+        ]}),
+        ('权限', {'fields': ['is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions']}),
+        ('时间', {'fields': ['last_login', 'date_joined', 'updated_at']}),
+    ]
+    add_fieldsets = [
+        (None, {'classes': ['wide'], 'fields': ['username', 'email', 'gender', 'password1', 'password2']}),
+    ]
+    filter_horizontal = ['groups', 'user_permissions']
+    actions = [make_work_status_action(status, label) for status, label in CustomUser.WORK_STATUS_CHOICES]
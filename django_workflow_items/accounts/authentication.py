@@ -0,0 +1,13 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from django_workflow_items.db_router import pin_if_recent_write
+
+
+class ReplicaPinningJWTAuthentication(JWTAuthentication):
+    """
+    JWT 认证, 在加载用户前根据令牌中的用户ID检查读己之写标记,
+    用户近期有写操作时, 用户本身及后续读取均走主库。
+    """
+    def get_user(self, validated_token):
+        pin_if_recent_write(validated_token.get(api_settings.USER_ID_CLAIM))
+        return super().get_user(validated_token)
@@ -0,0 +1,41 @@
+from datetime import datetime, time, timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters, serializers
+
+
+class SnowflakeDateRangeFilter(filters.BaseFilterBackend):
+    """
+    按加入时间范围筛选用户, 将时间范围转换为雪花ID主键范围查询。
+    
+    查询参数:
+        joined_after: 起始时间(含), 支持 ISO 格式的日期或日期时间。
+        joined_before: 结束时间(不含), 仅提供日期时表示该日结束前。
+    """
+    def filter_queryset(self, request, queryset, view):
+        start = self.parse_param(request, 'joined_after')
+        end = self.parse_param(request, 'joined_before', end_of_day=True)
+        if start is None and end is None:
+            return queryset
+        return queryset.joined_between(start, end)
+    
+    def parse_param(self, request, name, end_of_day=False):
+        """
+        解析日期或日期时间查询参数, 格式错误时返回 400。
+        """
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            # 先按纯日期解析, parse_datetime 也接受纯日期, 会丢失"当天结束"的语义
+            parsed_date = parse_date(value)
+            if parsed_date is not None:
+                parsed = datetime.combine(parsed_date, time.min)
+                if end_of_day:
+                    parsed += timedelta(days=1)
+            else:
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    raise ValueError
+        except ValueError:
+            raise serializers.ValidationError({name: '日期格式错误, 应为 YYYY-MM-DD 或 ISO 8601 日期时间。'})
+        return parsed
@@ -0,0 +1,19 @@
+from django.contrib.auth.forms import UserChangeForm, UserCreationForm
+from .models import CustomUser
+
+
+class CustomUserCreationForm(UserCreationForm):
+    """
+    管理后台新增用户表单, 填写用户名、邮箱、性别并设置密码(经过密码校验后哈希存储)。
+    """
+    class Meta(UserCreationForm.Meta):
+        model = CustomUser
+        fields = ('username', 'email', 'gender')
+
+
+class CustomUserChangeForm(UserChangeForm):
+    """
+    管理后台编辑用户表单, 密码只显示哈希摘要, 通过独立的修改密码页面设置。
+    """
+    class Meta(UserChangeForm.Meta):
+        model = CustomUser
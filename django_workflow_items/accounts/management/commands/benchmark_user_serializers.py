@@ -0,0 +1,133 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from django_workflow_items.db_router import pin_to_primary
+from django_workflow_items.renderers import ORJSONRenderer
+from accounts.models import CustomUser, Department
+from accounts.serializers.user_serializer import UserSerializer, UserReadOnlySerializer
+
+# 测试用户的起始ID, 对应 1970 年的时间戳, 不会与真实用户的雪花ID冲突
+BENCHMARK_ID_BASE = 1 << 40
+
+
+def timed(func):
+    """
+    执行函数并返回 (结果, 耗时秒数)。
+    """
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    """
+    对比 UserSerializer 与 UserReadOnlySerializer 以及 JSON 渲染器的性能, 并校验两条路径输出的字节完全一致。
+    - 默认使用内存中构造的用户数据, 不读写数据库, 仅对比序列化本身。
+    - --from-db 时在事务中批量写入测试用户(结束后回滚), 计时包含查询: 
+      UserSerializer(qs.select_related('department')) 实例化模型, UserReadOnlySerializer 读取 .values() 行。
+    头像 URL 由存储后端逐行生成(Azure 存储开销较大), 单独统计其耗时, 两条路径均包含该开销。
+    
+    用法:
+        python manage.py benchmark_user_serializers --count 1000 --count 100000
+        python manage.py benchmark_user_serializers --from-db --count 1000
+    """
+    help = '对比用户序列化器与 JSON 渲染器的性能'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, action='append', help='参与测试的用户数量, 可多次指定')
+        parser.add_argument('--from-db', action='store_true', help='从数据库查询测试用户, 计时包含查询与模型实例化')
+
+    def handle(self, *args, **options):
+        counts = options['count'] or [1000, 100000]
+        request = RequestFactory().get('/accounts/users/')
+        context = {'request': request}
+        for count in counts:
+            users, rows = self.build_users(count)
+            if options['from_db']:
+                with transaction.atomic():
+                    pin_to_primary() # 未提交的测试数据仅在主库的当前事务中可见
+                    self.save_users(users)
+                    queryset = CustomUser.objects.filter(
+                        id__gte=BENCHMARK_ID_BASE, id__lt=BENCHMARK_ID_BASE + count,
+                    ).order_by('id')
+                    data, serializer_seconds = timed(
+                        lambda: UserSerializer(queryset.select_related('department'), many=True, context=context).data
+                    )
+                    fast_data, fast_seconds = timed(
+                        lambda: UserReadOnlySerializer(UserReadOnlySerializer.get_rows(queryset), context=context).data
+                    )
+                    transaction.set_rollback(True)
+            else:
+                data, serializer_seconds = timed(lambda: UserSerializer(users, many=True, context=context).data)
+                fast_data, fast_seconds = timed(lambda: UserReadOnlySerializer(rows, context=context).data)
+
+            storage = CustomUser._meta.get_field('avatar').storage
+            _, avatar_seconds = timed(lambda: [storage.url(row['avatar']) for row in rows if row['avatar']])
+            content, render_seconds = timed(lambda: JSONRenderer().render(data))
+            fast_content, fast_render_seconds = timed(lambda: ORJSONRenderer().render(fast_data))
+
+            if content != fast_content:
+                raise CommandError(f'{count} 个用户的快速序列化输出与 UserSerializer 不一致!')
+
+            self.stdout.write(f'用户数量: {count}' + (' (含数据库查询)' if options['from_db'] else ''))
+            self.stdout.write(f'  UserSerializer:         {serializer_seconds * 1000:10.1f} ms')
+            self.stdout.write(f'  UserReadOnlySerializer: {fast_seconds * 1000:10.1f} ms')
+            self.stdout.write(f'    其中头像 URL 生成:    {avatar_seconds * 1000:10.1f} ms')
+            self.stdout.write(f'  JSONRenderer:           {render_seconds * 1000:10.1f} ms')
+            self.stdout.write(f'  ORJSONRenderer:         {fast_render_seconds * 1000:10.1f} ms')
+        self.stdout.write(self.style.SUCCESS('输出一致性校验通过'))
+
+    def save_users(self, users):
+        """
+        将测试用户及其部门写入数据库, 部门逐个保存以取得自增ID。
+        """
+        for department in {user.department for user in users if user.department}:
+            department.id = None
+            department.save()
+        for user in users:
+            user.department_id = user.department.id if user.department else None
+        CustomUser.objects.bulk_create(users, batch_size=1000)
+
+    def build_users(self, count):
+        """
+        构造内存中的用户实例及其对应的 .values() 行数据。
+        """
+        departments = [
+            Department(id=index + 1, name=f'基准测试部门{index}', description=None if index % 2 else f'部门{index}描述')
+            for index in range(10)
+        ]
+        now = timezone.now()
+        users, rows = [], []
+        for index in range(count):
+            department = departments[index % len(departments)] if index % 7 else None
+            user = CustomUser(
+                id=BENCHMARK_ID_BASE + index,
+                username=f'benchmark_user{index}',
+                email=f'benchmark_user{index}@example.com',
+                gender='U',
+                date_joined=now - timedelta(seconds=index),
+                department=department,
+                position='工程师' if index % 3 else None,
+                work_status='active',
+                current_destination=None,
+                date_of_joining=date(2020, 1, 1) + timedelta(days=index % 1000),
+                date_of_leaving=None,
+                phone_number='13800000000',
+                emergency_contact=None,
+                avatar=f'avatars/{index}.png' if index % 2 else None,
+            )
+            users.append(user)
+            row = {field: getattr(user, field) for field in UserReadOnlySerializer.value_fields if '__' not in field}
+            row.update({
+                'avatar': user.avatar.name,
+                'department__name': department.name if department else None,
+                'department__description': department.description if department else None,
+            })
+            rows.append(row)
+        return users, rows
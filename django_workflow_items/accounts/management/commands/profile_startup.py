@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 在全新的子进程中模拟 worker 启动, 分阶段计时并统计各应用的模型导入与 ready 耗时
+PROFILE_SCRIPT = """
+import json
+import time
+
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS  # 触发 settings 模块导入
+settings_loaded = time.perf_counter()
+
+from django.apps.config import AppConfig
+
+app_timings = {}
+create_app_config = AppConfig.create.__func__
+
+def timed(label, name, func):
+    def wrapper(*args, **kwargs):
+        begin = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            app_timings.setdefault(label, {})[name] = (time.perf_counter() - begin) * 1000
+    return wrapper
+
+def create(cls, entry):
+    app_config = create_app_config(cls, entry)
+    app_config.import_models = timed(app_config.label, 'import_models', app_config.import_models)
+    app_config.ready = timed(app_config.label, 'ready', app_config.ready)
+    return app_config
+
+AppConfig.create = classmethod(create)
+django.setup()
+apps_ready = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+wsgi_ready = time.perf_counter()
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_loaded = time.perf_counter()
+
+print(json.dumps({
+    'phases': [
+        ['settings', (settings_loaded - started) * 1000],
+        ['apps_populate', (apps_ready - settings_loaded) * 1000],
+        ['wsgi_application', (wsgi_ready - apps_ready) * 1000],
+        ['url_conf', (urls_loaded - wsgi_ready) * 1000],
+    ],
+    'apps': app_timings,
+}))
+"""
+
+
+class Command(BaseCommand):
+    """
+    分析 worker 冷启动耗时: 各启动阶段耗时、各应用模型导入与 ready 耗时,
+    以及 python -X importtime 统计的最慢顶层模块, 超出预算时返回非零退出码。
+
+    用法:
+        python manage.py profile_startup --budget-ms 1500 --limit 15
+    """
+    help = '分析 worker 冷启动的导入耗时与应用加载耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=int, default=settings.STARTUP_BUDGET_MS, help='冷启动耗时预算(毫秒)')
+        parser.add_argument('--limit', type=int, default=15, help='展示最慢的顶层模块数量')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'django_workflow_items.settings')},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'启动分析子进程执行失败:\n{result.stderr[-2000:]}')
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        total_ms = sum(duration for _, duration in report['phases'])
+
+        self.stdout.write('启动阶段耗时:')
+        for phase, duration in report['phases']:
+            self.stdout.write(f'  {phase:<20} {duration:10.1f} ms')
+        self.stdout.write(f'  {"total":<20} {total_ms:10.1f} ms')
+
+        self.stdout.write('应用加载耗时:')
+        for label, timings in report['apps'].items():
+            self.stdout.write(
+                f'  {label:<20} import_models {timings.get("import_models", 0):8.1f} ms'
+                f'  ready {timings.get("ready", 0):8.1f} ms'
+            )
+
+        self.stdout.write('最慢的顶层模块 (累计导入耗时):')
+        for module, cumulative_ms in self.parse_importtime(result.stderr)[:options['limit']]:
+            self.stdout.write(f'  {module:<40} {cumulative_ms:10.1f} ms')
+
+        if total_ms > options['budget_ms']:
+            raise CommandError(f'冷启动耗时 {total_ms:.1f} ms 超出预算 {options["budget_ms"]} ms!')
+        self.stdout.write(self.style.SUCCESS(f'冷启动耗时 {total_ms:.1f} ms, 预算 {options["budget_ms"]} ms'))
+
+    def parse_importtime(self, output):
+        """
+        解析 -X importtime 输出, 返回按累计耗时降序排列的顶层模块列表。
+        输出格式: "import time: self [us] | cumulative | imported package", 子模块以空格缩进。
+        """
+        modules = []
+        for line in output.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if name.startswith('  ') or not cumulative.strip().isdigit():
+                continue # 跳过表头及被其他模块间接导入的子模块
+            modules.append((name.strip(), int(cumulative) / 1000))
+        return sorted(modules, key=lambda item: item[1], reverse=True)
@@ -1,11 +1,44 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
-from .utils import snowflake_generator
+from .utils import snowflake_generator, snowflake_id_lower_bound
+
+class CustomUserQuerySet(models.QuerySet):
+    """
+    用户查询集。雪花ID的高位即创建时间戳, 按加入时间的范围查询与排序
+    转换为主键范围条件, 直接利用聚簇主键索引, 无需 date_joined 索引与文件排序。
+    ID 在保存时先于 date_joined 生成, 二者相差不超过数毫秒, 边界精度为毫秒。
+    """
+    def joined_between(self, start=None, end=None):
+        """
+        筛选加入时间在 [start, end) 区间内的用户, 任一端为 None 表示不限制。
+        """
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(id__gte=snowflake_id_lower_bound(start))
+        if end is not None:
+            queryset = queryset.filter(id__lt=snowflake_id_lower_bound(end))
+        return queryset
+    
+    def newest(self):
+        """
+        按加入时间倒序排列, 使用主键排序代替 date_joined。
+        """
+        return self.order_by('-id')
+
 
 class CustomUserManager(BaseUserManager):
     """
     自定义用户管理器, 用于创建普通用户和超级用户。
     """
+    def get_queryset(self):
+        return CustomUserQuerySet(self.model, using=self._db)
+    
+    def joined_between(self, start=None, end=None):
+        return self.get_queryset().joined_between(start, end)
+    
+    def newest(self):
+        return self.get_queryset().newest()
+    
     def create_user(self, username, email, gender, password=None, **extra_fields):
         """
         创建并保存一个普通用户。
@@ -65,6 +98,7 @@ class Department(models.Model):
     """
     name = models.CharField('部门名称', max_length=50, unique=True, null=False)
     description = models.TextField('部门描述', blank=True, null=True)
+    updated_at = models.DateTimeField('更新时间', auto_now=True, db_index=True) # 增量同步游标依赖此字段
     
     class Meta:
         db_table = 'department_info'
@@ -109,12 +143,13 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     date_joined = models.DateTimeField('添加时间', auto_now_add=True)
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='所属部门', related_name='users')
     position = models.CharField('负责职位', max_length=50, blank=True, null=True)
-    work_status = models.CharField('工作状态', max_length=20, choices=WORK_STATUS_CHOICES, null=False, default='active')
+    work_status = models.CharField('工作状态', max_length=20, choices=WORK_STATUS_CHOICES, null=False, default='active', db_index=True) # 管理后台按状态筛选; InnoDB 二级索引附带主键, 筛选后按 -id 排序无需文件排序
     current_destination = models.CharField('当前去向', max_length=255, blank=True, null=True)
     date_of_joining = models.DateField('入职日期', blank=True, null=True)
     date_of_leaving = models.DateField('离职日期', blank=True, null=True)
     emergency_contact = models.CharField('紧急联系人信息', max_length=100, blank=True, null=True)
     avatar = models.ImageField('员工头像', upload_to='avatars/', null=True, blank=True)
+    updated_at = models.DateTimeField('更新时间', auto_now=True, db_index=True) # 增量同步游标依赖此字段
     
     # 指定使用自定义用户管理器
     objects = CustomUserManager()
@@ -135,4 +170,27 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def save(self, *args, **kwargs):
         if not self.id: # 仅在用户未拥有ID时生成新ID, 避免覆盖已有ID
             self.id = snowflake_generator.generate_id()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class Tombstone(models.Model):
+    """
+    删除记录模型, 记录已删除的用户和部门, 供客户端增量同步时移除本地缓存。
+    """
+    KIND_CHOICES = [
+        ('user', '用户'),
+        ('department', '部门'),
+    ]
+    
+    kind = models.CharField('记录类型', max_length=20, choices=KIND_CHOICES, null=False)
+    object_id = models.BigIntegerField('记录ID', null=False)
+    deleted_at = models.DateTimeField('删除时间', auto_now_add=True, db_index=True)
+    
+    class Meta:
+        db_table = 'sync_tombstone'
+        verbose_name = '删除记录'
+        verbose_name_plural = '删除记录'
+        ordering = ['deleted_at', 'id']
+    
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}'
@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    用户列表游标分页, 按主键(雪花ID)倒序即按加入时间倒序, 翻页使用主键范围查询。
+    """
+    ordering = '-id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -2,6 +2,10 @@ from rest_framework import serializers
 from ..models import CustomUser, Department
 from .department_serializer import DepartmentSerializer
 
+# 只读快速序列化所复用的 DRF 字段, 保证日期格式与 UserSerializer 完全一致
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
 class UserSerializer(serializers.ModelSerializer):
     """
     用户序列化器, 用于将用户模型转换为JSON格式。
@@ -46,4 +50,75 @@ class UserSerializer(serializers.ModelSerializer):
         department = validated_data.app('department', None)
         if department is not None:
             instance.department = department
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class UserReadOnlySerializer:
+    """
+    用户只读快速序列化器, 用于批量返回用户数据(通讯录、导出等)。
+    直接读取 .values() 查询结果并使用预先编译的字段取值函数, 跳过模型实例化
+    与 ModelSerializer 逐字段处理, 输出与 UserSerializer 完全一致。
+    
+    用法:
+        rows = UserReadOnlySerializer.get_rows(queryset)
+        data = UserReadOnlySerializer(rows, context={'request': request}).data
+    """
+    # .values() 需要查询的列, 部门信息通过 JOIN 一次取回
+    value_fields = (
+        'id', 'username', 'email', 'date_joined',
+        'department_id', 'department__name', 'department__description',
+        'position', 'work_status', 'current_destination',
+        'date_of_joining', 'date_of_leaving', 'phone_number',
+        'emergency_contact', 'avatar',
+    )
+    
+    # 与 UserSerializer 输出顺序一致的 (字段名, 取值函数) 列表, 头像相关字段依赖请求, 在 to_representation 中处理
+    plain_getters = (
+        ('id', lambda row: row['id']),
+        ('username', lambda row: row['username']),
+        ('email', lambda row: row['email']),
+        ('date_joined', lambda row: _datetime_field.to_representation(row['date_joined'])),
+        ('department', lambda row: None if row['department_id'] is None else {
+            'id': row['department_id'],
+            'name': row['department__name'],
+            'description': row['department__description'],
+        }),
+        ('position', lambda row: row['position']),
+        ('work_status', lambda row: row['work_status']),
+        ('current_destination', lambda row: row['current_destination']),
+        ('date_of_joining', lambda row: _date_field.to_representation(row['date_of_joining'])),
+        ('date_of_leaving', lambda row: _date_field.to_representation(row['date_of_leaving'])),
+        ('phone_number', lambda row: row['phone_number']),
+        ('emergency_contact', lambda row: row['emergency_contact']),
+    )
+    
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+        self.storage = CustomUser._meta.get_field('avatar').storage
+    
+    @classmethod
+    def get_rows(cls, queryset):
+        """
+        将用户查询集转换为快速序列化所需的 .values() 查询集。
+        """
+        return queryset.values(*cls.value_fields)
+    
+    def to_representation(self, row, request=None):
+        ret = {name: getter(row) for name, getter in self.plain_getters}
+        if row['avatar']:
+            # avatar 与 avatar_url 均为头像的完整 URL, 只计算一次
+            # 与 UserSerializer 一致, 无请求时 avatar 返回相对地址, avatar_url 无法构造
+            url = self.storage.url(row['avatar'])
+            absolute_url = request.build_absolute_uri(url) if request is not None else None
+            ret['avatar'] = absolute_url or url
+            ret['avatar_url'] = absolute_url
+        else:
+            ret['avatar'] = None
+            ret['avatar_url'] = None
+        return ret
+    
+    @property
+    def data(self):
+        request = self.context.get('request')
+        return [self.to_representation(row, request) for row in self.rows]
\ No newline at end of file
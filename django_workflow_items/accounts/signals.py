@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import CustomUser, Department, Tombstone
+
+
+@receiver(post_delete, sender=CustomUser)
+def record_user_tombstone(sender, instance, **kwargs):
+    """
+    用户被删除时记录删除标记, 供客户端增量同步。
+    """
+    Tombstone.objects.create(kind='user', object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Department)
+def touch_department_users(sender, instance, **kwargs):
+    """
+    部门删除时其下用户的外键由数据库批量置空, 不会触发 auto_now,
+    此处提前更新这些用户的 updated_at, 使其出现在下一次增量同步中。
+    """
+    instance.users.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Department)
+def record_department_tombstone(sender, instance, **kwargs):
+    """
+    部门被删除时记录删除标记, 供客户端增量同步。
+    """
+    Tombstone.objects.create(kind='department', object_id=instance.pk)
+
+
+@receiver(pre_save, sender=Department)
+def remember_department_display(sender, instance, using, **kwargs):
+    """
+    记录部门保存前的名称和描述, 供 post_save 判断是否发生变化。
+    """
+    instance._previous_display = (
+        Department.objects.using(using).filter(pk=instance.pk).values_list('name', 'description').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Department)
+def touch_renamed_department_users(sender, instance, created, **kwargs):
+    """
+    用户数据中内嵌部门名称和描述, 部门信息变化时更新其下用户的 updated_at,
+    使客户端缓存的用户记录在下一次增量同步中得到刷新。
+    """
+    previous = getattr(instance, '_previous_display', None)
+    if not created and previous is not None and previous != (instance.name, instance.description):
+        instance.users.update(updated_at=timezone.now())
@@ -0,0 +1,138 @@
+"""
+客户端增量同步。
+
+客户端携带上一次返回的不透明游标请求变更, 服务端按 (updated_at, id) 顺序
+分别扫描用户、部门和删除记录三条数据流, 每条数据流仅返回游标位置之后的记录。
+游标记录各数据流已同步到的位置, 排序稳定, 可安全地分页续传。
+用户数据中内嵌部门名称, 部门信息变更时其下用户的 updated_at 会一并更新(见 signals)。
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .models import CustomUser, Department, Tombstone
+from .serializers.department_serializer import DepartmentSerializer
+from .serializers.user_serializer import UserReadOnlySerializer
+
+# 游标中各数据流的键
+USER_STREAM = 'u'
+DEPARTMENT_STREAM = 'd'
+TOMBSTONE_STREAM = 't'
+
+
+def encode_cursor(positions):
+    """
+    将各数据流的同步位置编码为不透明游标。
+    """
+    payload = {
+        stream: [timestamp.isoformat(), pk] if timestamp is not None else None
+        for stream, (timestamp, pk) in positions.items()
+    }
+    data = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析游标, 返回各数据流的同步位置 {stream: (updated_at, id)}, 游标无效时返回 400。
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+        positions = {}
+        for stream in (USER_STREAM, DEPARTMENT_STREAM, TOMBSTONE_STREAM):
+            position = payload[stream]
+            if position is None:
+                positions[stream] = (None, None)
+                continue
+            timestamp = parse_datetime(position[0])
+            if timestamp is None:
+                raise ValueError
+            positions[stream] = (timestamp, int(position[1]))
+        return positions
+    except (binascii.Error, ValueError, KeyError, TypeError, IndexError):
+        raise serializers.ValidationError({'cursor': '无效的同步游标!'})
+
+
+def changed_after(queryset, field, position, horizon, limit):
+    """
+    按 (field, id) 顺序返回位置之后、horizon 之前的至多 limit + 1 条记录, 多取一条用于判断是否还有更多数据。
+    """
+    queryset = queryset.filter(**{f'{field}__lt': horizon})
+    timestamp, pk = position
+    if timestamp is not None:
+        # field >= timestamp 为索引提供可用的范围条件, OR 条件仅用于排除同一时间戳下已同步的记录
+        queryset = queryset.filter(
+            Q(**{f'{field}__gte': timestamp}),
+            Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'pk__gt': pk}),
+        )
+    return list(queryset.order_by(field, 'pk')[:limit + 1])
+
+
+def build_sync_payload(cursor, limit, context=None):
+    """
+    构造增量同步响应。
+
+    参数:
+        cursor (str): 上一次同步返回的游标, 首次同步为 None。
+        limit (int): 每条数据流本次最多返回的记录数。
+        context (dict): 序列化上下文, 需包含 request 以生成头像地址。
+
+    返回:
+        dict --> 变更的用户与部门、已删除或离职的记录ID、下一次同步的游标及是否还有更多数据。
+    """
+    # updated_at 在事务提交前写入, 较早写入的事务可能晚于较新的事务提交;
+    # 游标不越过 SYNC_SAFETY_SECONDS 之前的时间点, 保证未提交的变更不会被跳过
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_SAFETY_SECONDS)
+    if cursor:
+        positions = decode_cursor(cursor)
+    else:
+        # 首次同步返回全部用户和部门, 删除记录从安全时间点开始
+        positions = {
+            USER_STREAM: (None, None),
+            DEPARTMENT_STREAM: (None, None),
+            TOMBSTONE_STREAM: (horizon, 0),
+        }
+
+    user_rows = changed_after(
+        CustomUser.objects.values(*UserReadOnlySerializer.value_fields, 'is_active', 'updated_at'),
+        'updated_at', positions[USER_STREAM], horizon, limit,
+    )
+    departments = changed_after(Department.objects.all(), 'updated_at', positions[DEPARTMENT_STREAM], horizon, limit)
+    tombstones = changed_after(
+        Tombstone.objects.values('id', 'kind', 'object_id', 'deleted_at'),
+        'deleted_at', positions[TOMBSTONE_STREAM], horizon, limit,
+    )
+    has_more = any(len(records) > limit for records in (user_rows, departments, tombstones))
+    user_rows, departments, tombstones = user_rows[:limit], departments[:limit], tombstones[:limit]
+
+    if user_rows:
+        positions[USER_STREAM] = (user_rows[-1]['updated_at'], user_rows[-1]['id'])
+    if departments:
+        positions[DEPARTMENT_STREAM] = (departments[-1].updated_at, departments[-1].pk)
+    if tombstones:
+        positions[TOMBSTONE_STREAM] = (tombstones[-1]['deleted_at'], tombstones[-1]['id'])
+
+    # 已禁用或离职的用户与已删除的用户一样, 由客户端从本地缓存中移除
+    active_rows = [row for row in user_rows if row['is_active'] and row['work_status'] != 'inactive']
+    deleted_users = [row['id'] for row in user_rows if not row['is_active'] or row['work_status'] == 'inactive']
+    deleted_users += [row['object_id'] for row in tombstones if row['kind'] == 'user']
+    deleted_departments = [row['object_id'] for row in tombstones if row['kind'] == 'department']
+
+    return {
+        'users': UserReadOnlySerializer(active_rows, context=context).data,
+        'departments': DepartmentSerializer(departments, many=True).data,
+        'deleted': {
+            'users': deleted_users,
+            'departments': deleted_departments,
+        },
+        'cursor': encode_cursor(positions),
+        'has_more': has_more,
+    }
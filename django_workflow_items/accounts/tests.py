@@ -1,3 +1,436 @@
-from django.test import TestCase
+import os
+import tempfile
+from contextvars import copy_context
+from unittest import mock
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse
+from django.conf import settings
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django_workflow_items import db_router
+from django_workflow_items.renderers import ORJSONRenderer
+from .admin import ApproximateCountPaginator
+from .authentication import ReplicaPinningJWTAuthentication
+from .models import CustomUser, Department
+from .utils import CustomSnowflakeGenerator, decode_snowflake_id, snowflake_generator, snowflake_id_lower_bound
+from .serializers.user_serializer import UserSerializer, UserReadOnlySerializer
+
+REPLICA_ALIAS = 'replica_test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA_ALIAS], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+    """
+    主从路由测试, 主库为测试库, 副本为独立的 SQLite 文件, 二者数据互不同步,
+    通过读取到的数据判断查询实际发往的数据库。
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # 副本在测试类初始化后注册, 不参与测试运行器的建库与事务回滚, 测试期间只读
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        replica = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        configured = connections.configure_settings({'default': connections.settings['default'], REPLICA_ALIAS: replica})
+        connections.settings[REPLICA_ALIAS] = configured[REPLICA_ALIAS]
+        with connections[REPLICA_ALIAS].schema_editor() as editor:
+            editor.create_model(Department)
+            editor.create_model(CustomUser)
+        Department.objects.using(REPLICA_ALIAS).create(name='replica-only')
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = CustomUser.objects.create_user('alice', 'alice@example.com', 'F', 'password')
+        Department.objects.create(name='primary-only')
+
+    def read_departments(self, request):
+        return HttpResponse(','.join(Department.objects.values_list('name', flat=True)))
+
+    def write_department(self, request):
+        Department.objects.create(name='written')
+        return self.read_departments(request)
+
+    def call(self, view, method='get', user=None):
+        """
+        在独立上下文中经过中间件调用视图, 避免固定状态泄漏到其他测试。
+        """
+        request = getattr(self.factory, method)('/')
+        request.user = user or AnonymousUser()
+        middleware = db_router.ReplicaPinningMiddleware(view)
+        return copy_context().run(middleware, request).content.decode()
+
+    def is_pinned(self, user):
+        return cache.get(db_router.PIN_CACHE_KEY.format(user.pk)) is not None
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.call(self.read_departments, user=self.user), 'replica-only')
+        self.assertFalse(self.is_pinned(self.user))
+
+    def test_get_that_writes_pins_user(self):
+        self.assertEqual(self.call(self.write_department, user=self.user), 'primary-only,written')
+        self.assertTrue(self.is_pinned(self.user))
+        # 同一用户后续的读请求走主库, 其他用户仍读副本
+        self.assertEqual(self.call(self.read_departments, user=self.user), 'primary-only,written')
+        other = CustomUser.objects.create_user('bob', 'bob@example.com', 'M', 'password')
+        cache.delete(db_router.PIN_CACHE_KEY.format(other.pk))
+        self.assertEqual(self.call(self.read_departments, user=other), 'replica-only')
+
+    def test_unsafe_method_reads_from_primary(self):
+        self.assertEqual(self.call(self.read_departments, method='post', user=self.user), 'primary-only')
+        # 未发生写操作的非安全请求不设置固定标记
+        self.assertFalse(self.is_pinned(self.user))
+
+    def test_anonymous_write_does_not_pin(self):
+        self.assertEqual(self.call(self.write_department), 'primary-only,written')
+        self.assertEqual(self.call(self.read_departments), 'replica-only')
+
+    def test_register_then_login_reads_own_user(self):
+        client = APIClient()
+        client.force_authenticate(self.user) # 注册接口需已认证用户调用
+        password = 'Str0ng-passw0rd!'
+        response = client.post('/accounts/register/', {
+            'username': 'carol', 'email': 'carol@example.com', 'gender': 'F',
+            'password': password, 'password_confirm': password,
+        })
+        self.assertEqual(response.status_code, 201)
+        client = APIClient()
+        response = client.post('/accounts/login/', {'username': 'carol', 'password': password})
+        self.assertEqual(response.status_code, 200)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        # 新用户尚未同步到副本, 注册与登录记录的固定标记使认证从主库加载用户
+        response = client.get('/accounts/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'carol')
+        # 固定标记过期后从副本读取, 副本中不存在该用户
+        cache.clear()
+        self.assertEqual(client.get('/accounts/profile/').status_code, 401)
+
+    def test_jwt_authentication_checks_pin(self):
+        token = AccessToken.for_user(self.user)
+
+        def authenticate(request):
+            try:
+                ReplicaPinningJWTAuthentication().get_user(token)
+                found = True
+            except AuthenticationFailed: # 副本中不存在该用户
+                found = False
+            return HttpResponse(f'{db_router.is_pinned_to_primary()}:{found}')
+
+        self.assertEqual(self.call(authenticate), 'False:False')
+        # 用户近期有写操作时, 认证阶段即从主库加载用户
+        db_router.remember_user_write(self.user.pk)
+        self.assertEqual(self.call(authenticate), 'True:True')
+
+    def test_session_authentication_reads_from_primary(self):
+        self.assertEqual(db_router.PrimaryReplicaRouter().db_for_read(Session), 'default')
+        # 会话仅写入主库, 副本中既没有该会话也没有该用户
+        self.client.force_login(self.user)
+        request = self.factory.get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+
+        def view(request):
+            return HttpResponse(f'{request.user.username}:{self.read_departments(request).content.decode()}')
+
+        middleware = SessionMiddleware(AuthenticationMiddleware(db_router.ReplicaPinningMiddleware(view)))
+        # 认证查询走主库, 请求中其他读操作仍走副本
+        self.assertEqual(copy_context().run(middleware, request).content.decode(), 'alice:replica-only')
+
+    def test_allow_migrate_only_on_primary(self):
+        router = db_router.PrimaryReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'accounts'))
+        self.assertFalse(router.allow_migrate(REPLICA_ALIAS, 'accounts'))
+
+
+@override_settings(DATABASE_REPLICAS=[]) # 读写分离由 ReplicaRoutingTests 覆盖, 此处所有查询走测试主库
+class UserReadOnlySerializerTests(TestCase):
+    """
+    只读快速序列化器必须与 UserSerializer 输出完全一致的字节。
+    """
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='研发部', description='负责\u2028产品研发')
+        empty_department = Department.objects.create(name='行政部')
+        CustomUser.objects.create_user(
+            'full', 'full@example.com', 'M', 'password',
+            department=department, position='工程师', work_status='business_trip',
+            current_destination='上海', date_of_joining=date(2020, 1, 2), date_of_leaving=date(2024, 5, 6),
+            phone_number='13800000000', emergency_contact='张三', avatar='avatars/full.png',
+        )
+        CustomUser.objects.create_user('empty', 'empty@example.com', 'F', 'password')
+        CustomUser.objects.create_user(
+            'partial', 'partial@example.com', 'U', 'password',
+            department=empty_department, date_of_joining=date(2023, 7, 8),
+        )
+
+    def test_output_is_byte_identical(self):
+        request = RequestFactory().get('/accounts/users/')
+        context = {'request': request}
+        queryset = CustomUser.objects.select_related('department').order_by('id')
+        expected = JSONRenderer().render(UserSerializer(queryset, many=True, context=context).data)
+        data = UserReadOnlySerializer(UserReadOnlySerializer.get_rows(queryset), context=context).data
+        self.assertEqual(JSONRenderer().render(data), expected)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+
+    def test_user_list_is_paginated(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(username='full'))
+        response = client.get('/accounts/users/', {'page_size': 2})
+        self.assertEqual([user['username'] for user in response.data['results']], ['partial', 'empty'])
+        response = client.get(response.data['next'])
+        self.assertEqual([user['username'] for user in response.data['results']], ['full'])
+        self.assertIsNone(response.data['next'])
+
+
+class SnowflakeGeneratorTests(TestCase):
+    """
+    雪花ID生成器测试。
+    """
+    def test_gives_up_when_clock_moves_backwards(self):
+        generator = CustomSnowflakeGenerator(datacenter_id=1, worker_id=1)
+        generator.generator = iter(lambda: None, 0) # 模拟时钟回拨, 底层生成器始终返回 None
+        with self.assertRaises(RuntimeError):
+            generator.generate_id()
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class SnowflakeTimeRangeTests(TestCase):
+    """
+    雪花ID时间范围测试, 基于生成器实际的位布局。
+    """
+    def setUp(self):
+        # 边界时间按当前时区(Asia/Shanghai)构造
+        self.start = timezone.make_aware(datetime(2024, 3, 1, 9, 30))
+        self.end = timezone.make_aware(datetime(2024, 3, 1, 18, 0))
+        self.end_of_day = timezone.make_aware(datetime(2024, 3, 2))
+        ids = {
+            'before_start': snowflake_id_lower_bound(self.start) - 1,
+            'at_start': snowflake_id_lower_bound(self.start),
+            'before_end': snowflake_id_lower_bound(self.end) - 1,
+            'at_end': snowflake_id_lower_bound(self.end),
+            'before_next_day': snowflake_id_lower_bound(self.end_of_day) - 1,
+            'next_day': snowflake_id_lower_bound(self.end_of_day),
+        }
+        for username, user_id in ids.items():
+            CustomUser.objects.create_user(username, f'{username}@example.com', 'U', 'password', id=user_id)
+
+    def usernames(self, queryset):
+        return sorted(queryset.values_list('username', flat=True))
+
+    def test_decode_generated_id(self):
+        before = timezone.now()
+        snowflake_id = snowflake_generator.generate_id()
+        info = decode_snowflake_id(snowflake_id)
+        self.assertEqual(info.datacenter_id, settings.SNOWFLAKE_DATACENTER_ID)
+        self.assertEqual(info.worker_id, settings.SNOWFLAKE_WORKER_ID)
+        self.assertLess(abs(info.timestamp - before), timedelta(milliseconds=50))
+        self.assertLessEqual(snowflake_id.bit_length(), 63) # 可存入有符号 BIGINT
+
+    def test_lower_bound_brackets_generated_id(self):
+        for _ in range(100):
+            snowflake_id = snowflake_generator.generate_id()
+            timestamp = decode_snowflake_id(snowflake_id).timestamp
+            self.assertLessEqual(snowflake_id_lower_bound(timestamp), snowflake_id)
+            self.assertLess(snowflake_id, snowflake_id_lower_bound(timestamp + timedelta(milliseconds=1)))
+
+    def test_joined_between_aware_boundaries(self):
+        self.assertEqual(
+            self.usernames(CustomUser.objects.joined_between(self.start, self.end)),
+            ['at_start', 'before_end'],
+        )
+        # 其他时区表示的同一时刻结果相同
+        self.assertEqual(
+            self.usernames(CustomUser.objects.joined_between(self.start.astimezone(dt_timezone.utc), self.end)),
+            ['at_start', 'before_end'],
+        )
+
+    def test_joined_between_naive_boundaries(self):
+        start, end = timezone.make_naive(self.start), timezone.make_naive(self.end)
+        self.assertEqual(self.usernames(CustomUser.objects.joined_between(start, end)), ['at_start', 'before_end'])
+        self.assertEqual(
+            self.usernames(CustomUser.objects.joined_between(start=end)),
+            ['at_end', 'before_next_day', 'next_day'],
+        )
+
+    def test_filter_backend_boundaries(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(username='at_start'))
+
+        def fetch(**params):
+            response = client.get('/accounts/users/', params)
+            self.assertEqual(response.status_code, 200)
+            return sorted(user['username'] for user in response.data['results'])
+
+        # 带时区与不带时区的日期时间
+        self.assertEqual(fetch(joined_after=self.start.isoformat(), joined_before=self.end.isoformat()), ['at_start', 'before_end'])
+        naive_start = timezone.make_naive(self.start).isoformat()
+        naive_end = timezone.make_naive(self.end).isoformat()
+        self.assertEqual(fetch(joined_after=naive_start, joined_before=naive_end), ['at_start', 'before_end'])
+        # 仅日期的 joined_before 包含当天全天
+        self.assertEqual(
+            fetch(joined_after='2024-03-01', joined_before='2024-03-01'),
+            ['at_end', 'at_start', 'before_end', 'before_next_day', 'before_start'],
+        )
+        self.assertEqual(client.get('/accounts/users/', {'joined_after': 'invalid'}).status_code, 400)
+
+
+@override_settings(DATABASE_REPLICAS=[], SYNC_SAFETY_SECONDS=0)
+class SyncTests(TestCase):
+    """
+    增量同步接口测试。
+    """
+    def setUp(self):
+        self.department = Department.objects.create(name='研发部')
+        self.user = CustomUser.objects.create_user('alice', 'alice@example.com', 'F', 'password', department=self.department)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/accounts/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_through_changes_in_order(self):
+        for index in range(3):
+            CustomUser.objects.create_user(f'user{index}', f'user{index}@example.com', 'U', 'password')
+        usernames, cursor = [], None
+        while True:
+            data = self.sync(cursor, limit=2)
+            usernames += [user['username'] for user in data['users']]
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(usernames, ['alice', 'user0', 'user1', 'user2'])
+        self.assertEqual(self.sync(cursor)['users'], [])
+
+    def test_reports_deactivated_and_deleted_users(self):
+        bob = CustomUser.objects.create_user('bob', 'bob@example.com', 'M', 'password')
+        cursor = self.sync()['cursor']
+        bob_id = bob.pk
+        bob.delete()
+        self.user.work_status = 'inactive'
+        self.user.save()
+        data = self.sync(cursor)
+        self.assertEqual(data['users'], [])
+        self.assertEqual(sorted(data['deleted']['users']), sorted([self.user.pk, bob_id]))
+
+    def test_department_rename_refreshes_users(self):
+        cursor = self.sync()['cursor']
+        self.department.save() # 未修改名称和描述, 不应刷新用户
+        self.assertEqual(self.sync(cursor)['users'], [])
+        self.department.name = '平台部'
+        self.department.save()
+        data = self.sync(cursor)
+        self.assertEqual([user['department']['name'] for user in data['users']], ['平台部'])
+
+    def test_recent_changes_wait_for_safety_window(self):
+        with override_settings(SYNC_SAFETY_SECONDS=60):
+            data = self.sync()
+            self.assertEqual(data['users'], [])
+        # 安全时间窗口内的变更未被游标跳过
+        self.assertEqual([user['username'] for user in self.sync(data['cursor'])['users']], ['alice'])
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class CustomUserAdminTests(TestCase):
+    """
+    用户管理后台测试。
+    """
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'U', 'password')
+        self.client.force_login(self.admin)
+
+    def test_add_user_sets_password(self):
+        password = 'Str0ng-passw0rd!'
+        response = self.client.post('/admin/accounts/customuser/add/', {
+            'username': 'carol', 'email': 'carol@example.com', 'gender': 'F',
+            'password1': password, 'password2': password,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(CustomUser.objects.get(username='carol').check_password(password))
+
+    def test_change_password_page(self):
+        user = CustomUser.objects.create_user('bob', 'bob@example.com', 'M', 'password')
+        response = self.client.get(f'/admin/accounts/customuser/{user.pk}/change/')
+        self.assertContains(response, f'../../{user.pk}/password/')
+        password = 'N3w-passw0rd!'
+        response = self.client.post(f'/admin/accounts/customuser/{user.pk}/password/', {
+            'password1': password, 'password2': password,
+        })
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password(password))
+
+    def test_work_status_actions_issue_single_update(self):
+        users = [CustomUser.objects.create_user(f'user{index}', f'user{index}@example.com', 'U', 'password') for index in range(3)]
+        model_admin = site._registry[CustomUser]
+        request = RequestFactory().post('/admin/accounts/customuser/')
+        queryset = CustomUser.objects.filter(pk__in=[user.pk for user in users])
+        past = timezone.now() - timedelta(days=1)
+        for action in model_admin.actions:
+            status = action.__name__.removeprefix('mark_')
+            queryset.update(updated_at=past)
+            with mock.patch.object(model_admin, 'message_user'), self.assertNumQueries(1):
+                action(model_admin, request, queryset)
+            for user in queryset:
+                self.assertEqual(user.work_status, status)
+                self.assertGreater(user.updated_at, past)
+
+    def test_changelist_selects_departments_in_one_query(self):
+        def changelist_queries():
+            with CaptureQueriesContext(connections['default']) as queries:
+                response = self.client.get('/admin/accounts/customuser/')
+            self.assertEqual(response.status_code, 200)
+            return response, len(queries)
+
+        department = Department.objects.create(name='研发部')
+        CustomUser.objects.create_user('bob', 'bob@example.com', 'M', 'password', department=department)
+        _, expected = changelist_queries()
+        for index in range(5):
+            department = Department.objects.create(name=f'部门{index}')
+            CustomUser.objects.create_user(f'user{index}', f'user{index}@example.com', 'U', 'password', department=department)
+        response, count = changelist_queries()
+        # 部门随用户一次 JOIN 取回, 查询数量不随行数增长
+        self.assertEqual(count, expected)
+        self.assertEqual(response.context['cl'].queryset.query.select_related, {'department': {}})
+        self.assertContains(response, '部门4')
+
+    def test_paginator_counts(self):
+        for index in range(3):
+            CustomUser.objects.create_user(f'user{index}', f'user{index}@example.com', 'U', 'password', work_status='leave')
+        queryset = CustomUser.objects.order_by('-id')
+        filtered = queryset.filter(work_status='leave')
+        # 非 MySQL 数据库无法估算, 使用精确计数
+        self.assertEqual(ApproximateCountPaginator(queryset, 100).count, 4)
+        with mock.patch.object(ApproximateCountPaginator, 'estimate_table_rows', return_value=1000000):
+            self.assertEqual(ApproximateCountPaginator(queryset, 100).count, 1000000)
+            # 有筛选条件时不使用表行数估算
+            self.assertEqual(ApproximateCountPaginator(filtered, 100).count, 3)
+        with mock.patch.object(ApproximateCountPaginator, 'filtered_count_limit', 2):
+            self.assertEqual(ApproximateCountPaginator(filtered, 100).count, 2)
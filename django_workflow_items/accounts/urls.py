@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RegisterView, LoginView, LogoutView, UserProfileView, UpdateUserStatusView
+from .views import RegisterView, LoginView, LogoutView, UserProfileView, UserListView, SyncView, UpdateUserStatusView
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
@@ -7,6 +7,8 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'), # 用户登录
     path('logout/', LogoutView.as_view(), name='logout'), # 用户登出
     path('profile/', UserProfileView.as_view(), name='user-profile'), # 获取用户信息
+    path('users/', UserListView.as_view(), name='user-list'), # 获取用户列表
+    path('sync/', SyncView.as_view(), name='user-sync'), # 增量同步用户和部门
     path('update-status/<int:pk>/', UpdateUserStatusView.as_view(), name='update-user-status'), # 更新用户状态
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'), # 刷新访问令牌
 ]
\ No newline at end of file
@@ -1,17 +1,82 @@
-from snowflake import SnowflakeGenerator
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
+from django.utils import timezone
+
+# 雪花ID位布局: 41位毫秒时间戳 | 5位数据中心ID | 5位工作节点ID | 12位序列号
+DATACENTER_ID_BITS = 5
+WORKER_ID_BITS = 5
+SEQUENCE_BITS = 12
+WORKER_ID_SHIFT = SEQUENCE_BITS
+DATACENTER_ID_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS
+TIMESTAMP_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS + DATACENTER_ID_BITS
+# snowflake 库默认纪元为 Unix 纪元, 时间戳部分即 Unix 毫秒时间戳
+SNOWFLAKE_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# 生成ID时允许等待的最长时钟回拨(毫秒)
+MAX_CLOCK_BACKWARD_MS = 100
+
+SnowflakeIdInfo = namedtuple('SnowflakeIdInfo', ['timestamp', 'datacenter_id', 'worker_id', 'sequence'])
 
 
 class CustomSnowflakeGenerator:
-    def __init__(self, datacenter_id, worker_id):
-        # 根据库实际支持的参数名进行修改
-        self.generator = SnowflakeGenerator(worker_id=worker_id, machine_id=datacenter_id)
+    """
+    雪花ID生成器, 首次调用 generate_id 时才导入 snowflake 库并创建底层生成器,
+    避免在 worker 启动导入模型时产生额外开销。
+    """
+    def __init__(self, datacenter_id=None, worker_id=None):
+        self.datacenter_id = datacenter_id
+        self.worker_id = worker_id
+        self.generator = None
+        self._lock = threading.Lock()
+
+    def _create_generator(self):
+        from snowflake import SnowflakeGenerator
+
+        datacenter_id = self.datacenter_id if self.datacenter_id is not None else settings.SNOWFLAKE_DATACENTER_ID
+        worker_id = self.worker_id if self.worker_id is not None else settings.SNOWFLAKE_WORKER_ID
+        # snowflake 库使用10位实例ID, 高5位为数据中心ID, 低5位为工作节点ID
+        return SnowflakeGenerator((datacenter_id << WORKER_ID_BITS) | worker_id)
 
     def generate_id(self):
-        return self.generator.generate()
+        with self._lock:
+            if self.generator is None:
+                self.generator = self._create_generator()
+            # 同一毫秒内序列号耗尽或时钟回拨时生成器返回 None, 休眠约1毫秒后重试
+            # 时钟回拨超过 MAX_CLOCK_BACKWARD_MS 时放弃, 避免长时间占用锁
+            for _ in range(MAX_CLOCK_BACKWARD_MS):
+                snowflake_id = next(self.generator)
+                if snowflake_id is not None:
+                    return snowflake_id
+                time.sleep(0.001)
+            raise RuntimeError(f'系统时钟回拨超过 {MAX_CLOCK_BACKWARD_MS} 毫秒, 无法生成雪花ID!')
+
+def decode_snowflake_id(snowflake_id):
+    """
+    解析雪花ID。
+    
+    返回:
+        SnowflakeIdInfo --> (生成时间(UTC), 数据中心ID, 工作节点ID, 序列号)
+    """
+    milliseconds = snowflake_id >> TIMESTAMP_SHIFT
+    return SnowflakeIdInfo(
+        timestamp = SNOWFLAKE_EPOCH + timedelta(milliseconds=milliseconds),
+        datacenter_id = (snowflake_id >> DATACENTER_ID_SHIFT) & ((1 << DATACENTER_ID_BITS) - 1),
+        worker_id = (snowflake_id >> WORKER_ID_SHIFT) & ((1 << WORKER_ID_BITS) - 1),
+        sequence = snowflake_id & ((1 << SEQUENCE_BITS) - 1),
+    )
+
+def snowflake_id_lower_bound(value):
+    """
+    计算给定时间对应的最小雪花ID, 该毫秒及之后生成的ID均不小于此值。
+    无时区的时间按当前时区处理。
+    """
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    milliseconds = (value - SNOWFLAKE_EPOCH) // timedelta(milliseconds=1)
+    return max(milliseconds, 0) << TIMESTAMP_SHIFT
 
-# 使用自定义生成器
-snowflake_generator = CustomSnowflakeGenerator(
-    datacenter_id=settings.SNOWFLAKE_DATACENTER_ID,
-    worker_id=settings.SNOWFLAKE_WORKER_ID
-)
\ No newline at end of file
+# 使用自定义生成器, 数据中心ID与工作节点ID在首次生成ID时从 settings 读取
+snowflake_generator = CustomSnowflakeGenerator()
@@ -2,13 +2,18 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from .serializers.auth_serializers import RegisterSerializer, LoginSerializer
-from .serializers.user_serializer import UserSerializer
+from .serializers.user_serializer import UserSerializer, UserReadOnlySerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import logout as django_logout
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import generics
 from rest_framework.parsers import MultiPartParser, FormParser
 from .models import CustomUser
+from .filters import SnowflakeDateRangeFilter
+from .pagination import UserCursorPagination
+from .sync import build_sync_payload
+from django.conf import settings
+from django_workflow_items.db_router import pin_to_primary, remember_user_write
 
 class RegisterView(APIView):
     """
@@ -18,6 +23,7 @@ class RegisterView(APIView):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save() # 创建用户
+            remember_user_write(user.pk) # 新用户不是当前请求的用户, 中间件不会为其记录, 需显式记录使其随后的登录与查询读取主库
             user_serializer = UserSerializer(user, context={'request': request}) # 序列化用户信息
             return Response(user_serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -32,7 +38,8 @@ class LoginView(APIView):
     def post(self, request):
         serializer = LoginSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            user = serializer.validated_data['user']
+            user = serializer.user # validated_data['user'] 为序列化后的用户信息, 模型实例由 TokenObtainSerializer 保存在 serializer.user
+            remember_user_write(user.pk) # 刚注册的用户可能尚未同步到副本, 登录后的请求先读取主库
             # 生成 JWT 刷新令牌和访问令牌
             refresh = RefreshToken.for_user(user)
             access_token = str(refresh.access_token)
@@ -95,6 +102,45 @@ class UserProfileView(APIView):
         serializer = UserSerializer(request.user, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+class UserListView(generics.ListAPIView):
+    """
+    用户列表视图, 处理 GET 请求以获取员工通讯录。
+    使用只读快速序列化器, 输出与 UserSerializer 一致。
+    支持 joined_after / joined_before 参数按加入时间筛选, 结果按加入时间倒序并以游标分页返回。
+    """
+    queryset = CustomUser.objects.newest()
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [SnowflakeDateRangeFilter]
+    pagination_class = UserCursorPagination
+    
+    def list(self, request, *args, **kwargs):
+        queryset = UserReadOnlySerializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        data = UserReadOnlySerializer(rows, context=self.get_serializer_context()).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data, status=status.HTTP_200_OK)
+
+class SyncView(APIView):
+    """
+    增量同步视图, 处理 GET 请求以返回游标之后变更的用户和部门。
+    - cursor: 上一次同步返回的游标, 首次同步不传。
+    - limit: 每类记录本次最多返回的数量, has_more 为 True 时客户端应携带新游标继续请求。
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', settings.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response({"limit": "limit 必须为整数。"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+        pin_to_primary() # 同步游标依赖最新数据, 始终读取主库, 避免副本延迟导致跳过变更
+        data = build_sync_payload(request.query_params.get('cursor'), limit, context={'request': request})
+        return Response(data, status=status.HTTP_200_OK)
+
 class UpdateUserStatusView(generics.UpdateAPIView):
     """
     允许管理员更新用户的工作状态和当前去向。
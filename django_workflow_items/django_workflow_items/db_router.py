@@ -0,0 +1,120 @@
+"""
+主从数据库路由配置。
+
+读操作分发到 settings.DATABASE_REPLICAS 中的只读副本, 写操作始终发往主库 default。
+为保证"读己之写", 用户发生写操作后的一段时间内(REPLICA_PIN_SECONDS),
+该用户在所有设备上的读请求都会被固定(pin)到主库, 避免更新后立即查询时读取到尚未同步的旧数据。
+固定标记按用户ID保存在缓存中, 多 worker 部署时需使用共享缓存。
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# 当前请求(或上下文)是否固定到主库
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+# 当前请求(或上下文)是否发生过写操作
+_wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+
+PRIMARY_DB_ALIAS = 'default'
+PIN_CACHE_KEY = 'db_pin:{}'
+# 始终读取主库的应用: 会话在登录等写入后立即被下一个请求读取, 副本延迟会导致会话丢失
+PRIMARY_ONLY_APPS = ('sessions',)
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def pin_to_primary():
+    """
+    将当前上下文中的后续读操作固定到主库。
+    """
+    _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary():
+    """
+    判断当前上下文是否已固定到主库。
+    """
+    return _pinned_to_primary.get()
+
+
+def remember_user_write(user_id):
+    """
+    记录用户刚刚发生过写操作, 在 REPLICA_PIN_SECONDS 秒内该用户的读请求走主库。
+    """
+    cache.set(PIN_CACHE_KEY.format(user_id), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def pin_if_recent_write(user_id):
+    """
+    用户近期发生过写操作时, 将当前上下文固定到主库。需在确定请求用户后(认证完成后)调用。
+    """
+    if user_id is not None and cache.get(PIN_CACHE_KEY.format(user_id)):
+        pin_to_primary()
+
+
+class PrimaryReplicaRouter:
+    """
+    主从路由器, 写操作走主库, 读操作随机选择一个只读副本。
+    未配置副本、当前上下文已固定到主库或模型属于 PRIMARY_ONLY_APPS 时, 读操作同样走主库。
+    """
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas or is_pinned_to_primary() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # 发生写操作后, 同一上下文中的读操作改为走主库
+        pin_to_primary()
+        _wrote_to_primary.set(True)
+        return PRIMARY_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 主库与副本数据一致, 允许任意关联
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 仅在主库执行迁移, 副本通过数据库复制同步表结构
+        return db == PRIMARY_DB_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """
+    读己之写中间件, 需位于 AuthenticationMiddleware 之后。
+    - 非安全方法(POST/PUT/PATCH/DELETE)的整个请求固定到主库, 避免基于旧数据的更新覆盖。
+    - 会话认证的用户在请求开始时检查固定标记, 会话与用户本身从主库读取; JWT 认证的用户由
+      accounts.authentication.ReplicaPinningJWTAuthentication 在认证后检查。
+    - 请求中实际发生写操作时, 为当前用户记录固定标记。
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_token = _pinned_to_primary.set(request.method not in SAFE_METHODS)
+        wrote_token = _wrote_to_primary.set(False)
+        try:
+            pin_if_recent_write(self.get_user_id(request))
+            response = self.get_response(request)
+            # DRF 认证后会将用户回写到 request.user, 此处可取得 JWT 认证的用户
+            user_id = self.get_user_id(request)
+            if _wrote_to_primary.get() and user_id is not None:
+                remember_user_write(user_id)
+            return response
+        finally:
+            _pinned_to_primary.reset(pinned_token)
+            _wrote_to_primary.reset(wrote_token)
+
+    def get_user_id(self, request):
+        user = getattr(request, 'user', None)
+        if user is None:
+            return None
+        # 会话认证在首次访问 request.user 时才读取会话与用户, 此时尚未检查固定标记,
+        # 认证查询固定读取主库, 避免登录后副本未同步时会话或用户查询失败
+        pinned_token = _pinned_to_primary.set(True)
+        try:
+            if not user.is_authenticated:
+                return None
+            return user.pk
+        finally:
+            _pinned_to_primary.reset(pinned_token)
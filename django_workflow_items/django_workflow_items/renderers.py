@@ -0,0 +1,35 @@
+"""
+基于 orjson 的 JSON 渲染器。
+
+orjson 为可选依赖, 未安装或请求了缩进等 orjson 不支持的输出格式时,
+自动回退到 DRF 默认的 JSONRenderer, 两者在默认配置下输出的字节完全一致。
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError: # 未安装 orjson 时使用标准库渲染
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    使用 orjson 序列化响应数据的渲染器, 大批量用户数据场景下显著降低 CPU 开销。
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        # orjson 仅支持紧凑的 UTF-8 输出, 其余配置交由标准渲染器处理
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME, # 日期时间交由 DRF 编码器, 保持格式一致
+        )
+        # 与 JSONRenderer 一致, 转义 \u2028 和 \u2029 以保证输出是合法的 JavaScript 子集
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -11,7 +11,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 import os
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,7 +43,7 @@ INSTALLED_APPS = [
     'rest_framework', # Django REST Framework
     'rest_framework_simplejwt.token_blacklist',  # Simple JWT 的黑名单功能
     'corsheaders', # 跨域配置
-    'storages',  # Django Storages
+    # Django Storages 无需注册为应用, 存储后端由 STORAGES 配置并在首次访问文件时加载
     'accounts', # 用户管理模块
     
 ]
@@ -59,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',  # 确保位于 CorsMiddleware 之后
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django_workflow_items.db_router.ReplicaPinningMiddleware', # 主从读写分离, 写后读固定主库, 需位于认证中间件之后
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -117,6 +119,49 @@ DATABASES = {
     }
 }
 
+# 只读副本配置, 未配置时所有读写均走主库
+# - DB_REPLICA_HOSTS: 副本主机, 多个以逗号分隔
+# - DB_REPLICA_NAMES: 副本库名(SQLite 时为数据库文件路径), 多个以逗号分隔, 默认与主库相同
+# - DB_REPLICA_ENGINE: 副本数据库引擎, 默认与主库相同; 引擎不同时不复用主库的账号与连接选项
+# 测试运行器以 MIRROR 将副本指向主库的测试库, 读写分离本身由 accounts.tests 使用独立的 SQLite 副本验证
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+DB_REPLICA_NAMES = config('DB_REPLICA_NAMES', default='', cast=Csv())
+DB_REPLICA_ENGINE = config('DB_REPLICA_ENGINE', default=DATABASES['default']['ENGINE'])
+DATABASE_REPLICAS = []
+for index in range(max(len(DB_REPLICA_HOSTS), len(DB_REPLICA_NAMES))):
+    alias = f'replica_{index}'
+    if DB_REPLICA_ENGINE == DATABASES['default']['ENGINE']:
+        replica = {
+            **DATABASES['default'],
+            'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        }
+    else:
+        replica = {'ENGINE': DB_REPLICA_ENGINE}
+    if index < len(DB_REPLICA_HOSTS):
+        replica['HOST'] = DB_REPLICA_HOSTS[index]
+    if index < len(DB_REPLICA_NAMES):
+        replica['NAME'] = DB_REPLICA_NAMES[index]
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[alias] = replica
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['django_workflow_items.db_router.PrimaryReplicaRouter']
+# 写操作后读请求固定到主库的标记保存在缓存中, 配置副本时必须使用各 worker 共享的缓存(如 Redis)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+# 进程内缓存的固定标记对其他 worker 不可见, 读己之写会静默失效, 启动时直接报错
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+if DATABASE_REPLICAS and CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS:
+    raise ImproperlyConfigured('配置只读副本(DB_REPLICA_HOSTS / DB_REPLICA_NAMES)时, 必须通过 CACHE_BACKEND 配置共享缓存(如 Redis)!')
+REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=int) # 写操作后读请求固定到主库的时长(秒)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -139,11 +184,17 @@ AUTH_PASSWORD_VALIDATORS = [
 # Django REST Framework 配置
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # 使用 JWT 认证
+        'accounts.authentication.ReplicaPinningJWTAuthentication',  # 使用 JWT 认证, 并在认证后检查读己之写标记
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # 默认需要认证
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # 开启 USE_ORJSON_RENDERER 时使用 orjson 渲染 JSON (需安装 orjson, 未安装时自动回退)
+        'django_workflow_items.renderers.ORJSONRenderer' if config('USE_ORJSON_RENDERER', default=False, cast=bool)
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Simple JWT 配置
@@ -202,7 +253,15 @@ AZURE_ACCOUNT_KEY = config('AZURE_ACCOUNT_KEY') # 存储账户密钥
 AZURE_CUSTOM_DOMAIN = f'{AZURE_ACCOUNT_NAME}.blob.core.windows.net'
 
 # 使用 Azure Blob Storage 作为默认文件存储后端
-DEFAULT_AUTO_STORAGE = 'storages.backends.azure_storage.AzureStorage'
+# default_storage 为惰性对象, Azure SDK 在首次读写文件时才会被导入
+STORAGES = {
+    'default': {
+        'BACKEND': 'storages.backends.azure_storage.AzureStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 AZURE_SSL = True # 使用HTTPS
 
@@ -211,4 +270,13 @@ MEDIA_URL = f'https://{AZURE_CUSTOM_DOMAIN}/{AZURE_CONTAINER}/'
 
 # 雪花算法配置
 SNOWFLAKE_WORKER_ID = 1 # 每个工作节点的唯一ID, 范围通常0-31
-SNOWFLAKE_DATACENTER_ID = 1 # 每个数据中心唯一ID
\ No newline at end of file
+SNOWFLAKE_DATACENTER_ID = 1 # 每个数据中心唯一ID
+
+# 增量同步接口每类记录的默认/最大返回数量
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=500, cast=int)
+SYNC_MAX_PAGE_SIZE = 1000
+# 增量同步只返回该时长之前的变更, 需大于最长写事务的耗时, 避免晚提交的变更被游标跳过
+SYNC_SAFETY_SECONDS = config('SYNC_SAFETY_SECONDS', default=5, cast=int)
+
+# worker 冷启动耗时预算(毫秒), 供 profile_startup 命令检查
+STARTUP_BUDGET_MS = config('STARTUP_BUDGET_MS', default=1500, cast=int)